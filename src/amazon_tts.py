@@ -4,25 +4,47 @@
 
 Usage:
     # 出力ファイル名を自動生成する場合
-    uv run src/amazon_tts.py data/ssmls/input.ssml
+    uv run src/amazon_tts.py synth data/ssmls/input.ssml
 
     # 出力ファイル名を指定する場合
-    uv run src/amazon_tts.py data/ssmls/input.ssml --output data/audios/output.mp3
+    uv run src/amazon_tts.py synth data/ssmls/input.ssml --output data/audios/output.mp3
 
     # 音声を指定する場合
-    uv run src/amazon_tts.py data/ssmls/input.ssml --voice Mizuki
+    uv run src/amazon_tts.py synth data/ssmls/input.ssml --voice Mizuki
+
+    # 複数の SSML ファイルをまとめて変換する場合
+    uv run src/amazon_tts.py batch "data/ssmls/*.ssml" --concurrency 8
+
+    # 合成結果のキャッシュの統計情報を表示する場合
+    uv run src/amazon_tts.py stats
 """
 
+import asyncio
 import os
+import shutil
+import time
 from enum import Enum
+from functools import cache
 from pathlib import Path
+from urllib.parse import unquote, urlparse
 
 import boto3
 import typer
+from botocore.config import Config
 from dotenv import load_dotenv
-from rich.console import Console
 
-from utils import generate_output_filename, read_ssml_file
+from utils import (
+    CACHE_DIR,
+    cache_stats,
+    cached_synthesize,
+    expand_ssml_glob,
+    generate_output_filename,
+    progress_status,
+    read_ssml_file,
+    run_batch,
+    split_ssml,
+    synthesize_parallel,
+)
 
 
 class PollyVoice(str, Enum):
@@ -38,32 +60,208 @@ class PollyVoice(str, Enum):
 load_dotenv()
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
+POLLY_S3_BUCKET = os.getenv("POLLY_S3_BUCKET")
+
+# synthesize_speech で扱える最大文字数（これを超える場合は非同期タスクで合成する）
+POLLY_SYNC_MAX_CHARACTERS = 3000
+
+# 非同期タスクの完了を待つ最大秒数
+POLLY_TASK_TIMEOUT_SECONDS = 600
 
 app = typer.Typer()
 
 
-def synthesize_ssml(
+@cache
+def get_polly_client():
+    """Amazon Pollyクライアントを取得する。
+
+    TCPキープアライブとコネクションプールを有効にしたクライアントをプロセス内で使い回し、
+    呼び出しごとのTCP/TLSハンドシェイクを省く。
+
+    Returns:
+        Amazon Pollyクライアント
+    """
+    # botocoreは既定でTCP_NODELAY（Nagleアルゴリズム無効）を設定するため、
+    # tcp_keepalive=True でSO_KEEPALIVEを追加するだけでよい
+    config = Config(
+        tcp_keepalive=True,
+        max_pool_connections=10,
+        retries={"mode": "adaptive", "max_attempts": 3},
+    )
+    return boto3.client(
+        "polly",
+        config=config,
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        region_name="us-west-2",
+    )
+
+
+@cache
+def _get_s3_client():
+    """非同期タスクの出力をダウンロードするためのS3クライアントを取得する。"""
+    return boto3.client(
+        "s3",
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        region_name="us-west-2",
+    )
+
+
+def _output_s3_key(output_uri: str) -> str:
+    """音声合成タスクの出力先URIから、POLLY_S3_BUCKET内のオブジェクトキーを取り出す。
+
+    パス形式（https://s3.<region>.amazonaws.com/<bucket>/<key>）と
+    仮想ホスト形式（https://<bucket>.s3.<region>.amazonaws.com/<key>）の両方に対応する。
+
+    Args:
+        output_uri: 音声合成タスクの出力先URI
+
+    Returns:
+        オブジェクトキー
+    """
+    parsed = urlparse(output_uri)
+    path = unquote(parsed.path).lstrip("/")
+    if (parsed.hostname or "").startswith(f"{POLLY_S3_BUCKET}."):
+        key = path
+    elif path.startswith(f"{POLLY_S3_BUCKET}/"):
+        key = path[len(POLLY_S3_BUCKET) + 1 :]
+    else:
+        key = ""
+
+    if not key:
+        raise Exception(
+            f"音声合成タスクの出力先URIを解釈できませんでした: {output_uri}"
+        )
+    return key
+
+
+def _synthesize_ssml_task(
     ssml_text: str,
     voice_name: str,
     output_path: Path,
+    show_progress: bool = True,
 ) -> None:
-    """SSMLをオーディオファイルに変換する。
+    """StartSpeechSynthesisTaskを使って長いSSMLをオーディオファイルに変換する。
+
+    合成結果は POLLY_S3_BUCKET に出力されるため、完了を待ってからダウンロードする。
 
     Args:
         ssml_text: SSML形式のテキスト
         voice_name: 使用する音声モデル名（例: 'Mizuki', 'Takumi'）
         output_path: 出力先のオーディオファイルパス
+        show_progress: 合成中にスピナーを表示するかどうか
     """
-    # Amazon Pollyクライアントを初期化
-    polly_client = boto3.Session(
-        aws_access_key_id=AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-        region_name="us-west-2",
-    ).client("polly")
+    if not POLLY_S3_BUCKET:
+        raise ValueError(
+            f"{POLLY_SYNC_MAX_CHARACTERS}文字を超えるSSMLを合成するには、POLLY_S3_BUCKETを.envファイルに設定してください。"
+        )
+
+    polly_client = get_polly_client()
+
+    # 非同期タスクを開始し、完了するまで間隔を広げながらポーリングする
+    with progress_status("音声合成タスクを実行中...", show_progress):
+        task = polly_client.start_speech_synthesis_task(
+            Text=ssml_text,
+            TextType="ssml",
+            OutputFormat="mp3",
+            VoiceId=voice_name,
+            OutputS3BucketName=POLLY_S3_BUCKET,
+        )["SynthesisTask"]
+
+        delay = 1.0
+        deadline = time.monotonic() + POLLY_TASK_TIMEOUT_SECONDS
+        while task["TaskStatus"] not in ("completed", "failed"):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"音声合成タスクが{POLLY_TASK_TIMEOUT_SECONDS}秒以内に完了しませんでした: {task['TaskId']}"
+                )
+            time.sleep(delay)
+            delay = min(delay * 2, 30.0)
+            task = polly_client.get_speech_synthesis_task(TaskId=task["TaskId"])[
+                "SynthesisTask"
+            ]
+
+    if task["TaskStatus"] == "failed":
+        raise Exception(f"音声合成タスクが失敗しました: {task.get('FailureReason')}")
+
+    key = _output_s3_key(task["OutputUri"])
+
+    # 出力ディレクトリが存在しない場合は作成
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # ダウンロード後、バケットに残った出力を削除する
+    s3_client = _get_s3_client()
+    s3_client.download_file(POLLY_S3_BUCKET, key, str(output_path))
+    s3_client.delete_object(Bucket=POLLY_S3_BUCKET, Key=key)
+    typer.echo(f"✓ オーディオファイルを保存しました: {output_path}")
+
+
+def _synthesize_chunk(polly_client, ssml_text: str, voice_name: str) -> bytes:
+    """分割したSSMLを合成し、オーディオのバイト列を返す。
+
+    Args:
+        polly_client: Amazon Pollyクライアント
+        ssml_text: 分割したSSML形式のテキスト
+        voice_name: 使用する音声モデル名（例: 'Mizuki', 'Takumi'）
+
+    Returns:
+        MP3形式のオーディオのバイト列
+    """
+    response = polly_client.synthesize_speech(
+        Text=ssml_text,
+        TextType="ssml",
+        OutputFormat="mp3",
+        VoiceId=voice_name,
+    )
+    if "AudioStream" not in response:
+        raise Exception("音声データが取得できませんでした")
+    return response["AudioStream"].read()
+
+
+def _synthesize_ssml(
+    ssml_text: str,
+    voice_name: str,
+    output_path: Path,
+    show_progress: bool = True,
+    parallel: bool = False,
+) -> None:
+    """APIを呼び出してSSMLをオーディオファイルに変換する。
+
+    Args:
+        ssml_text: SSML形式のテキスト
+        voice_name: 使用する音声モデル名（例: 'Mizuki', 'Takumi'）
+        output_path: 出力先のオーディオファイルパス
+        show_progress: 合成中にスピナーを表示するかどうか
+        parallel: SSMLを文・段落単位に分割して並行して合成するかどうか
+    """
+    # Amazon Pollyクライアントを取得
+    polly_client = get_polly_client()
+
+    # SSMLを文・段落単位に分割できる場合は、並行して合成する
+    # （同期APIの上限を超える部分がある場合は分割せず、非同期タスクなどで合成する）
+    chunks = split_ssml(ssml_text) if parallel else []
+    if len(chunks) > 1 and all(
+        len(chunk) <= POLLY_SYNC_MAX_CHARACTERS for chunk in chunks
+    ):
+        with progress_status(
+            f"音声合成を実行中（{len(chunks)}分割）...", show_progress
+        ):
+            synthesize_parallel(
+                chunks,
+                lambda chunk: _synthesize_chunk(polly_client, chunk, voice_name),
+                output_path,
+            )
+        typer.echo(f"✓ オーディオファイルを保存しました: {output_path}")
+        return
+
+    # 長いSSMLは同期APIで扱えないため、非同期タスクで合成する
+    if len(ssml_text) > POLLY_SYNC_MAX_CHARACTERS:
+        _synthesize_ssml_task(ssml_text, voice_name, output_path, show_progress)
+        return
 
     # 音声合成を実行
-    console = Console()
-    with console.status("[bold green]音声合成を実行中...", spinner="dots"):
+    with progress_status("音声合成を実行中...", show_progress):
         response = polly_client.synthesize_speech(
             Text=ssml_text,
             TextType="ssml",
@@ -74,16 +272,45 @@ def synthesize_ssml(
     # 出力ディレクトリが存在しない場合は作成
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # オーディオコンテンツをファイルに書き込む
+    # オーディオコンテンツをファイルに書き込む（全体をメモリに載せず、64KiBずつ書き出す）
     if "AudioStream" in response:
         with output_path.open("wb") as file:
-            file.write(response["AudioStream"].read())
+            shutil.copyfileobj(response["AudioStream"], file, length=64 * 1024)
         typer.echo(f"✓ オーディオファイルを保存しました: {output_path}")
     else:
         raise Exception("音声データが取得できませんでした")
 
 
-@app.command()
+def synthesize_ssml(
+    ssml_text: str,
+    voice_name: str,
+    output_path: Path,
+    show_progress: bool = True,
+    parallel: bool = False,
+) -> None:
+    """SSMLをオーディオファイルに変換する。
+
+    同じSSMLと音声モデルの組み合わせで合成済みの場合は、APIを呼び出さずにキャッシュを利用する。
+    分割して合成した結果は連結部分が異なるため、分割の有無ごとに別々にキャッシュする。
+
+    Args:
+        ssml_text: SSML形式のテキスト
+        voice_name: 使用する音声モデル名（例: 'Mizuki', 'Takumi'）
+        output_path: 出力先のオーディオファイルパス
+        show_progress: 合成中にスピナーを表示するかどうか
+        parallel: SSMLを文・段落単位に分割して並行して合成するかどうか
+    """
+    if cached_synthesize(
+        (ssml_text, voice_name, "amazon", "parallel" if parallel else "single"),
+        output_path,
+        lambda: _synthesize_ssml(
+            ssml_text, voice_name, output_path, show_progress, parallel
+        ),
+    ):
+        typer.echo(f"✓ キャッシュからオーディオファイルを復元しました: {output_path}")
+
+
+@app.command("synth")
 def main(
     input_file: Path = typer.Argument(
         ...,
@@ -106,6 +333,11 @@ def main(
         help="使用する音声モデル名（Amazon Polly VoiceId）",
         case_sensitive=False,
     ),
+    parallel: bool = typer.Option(
+        False,
+        "--parallel/--no-parallel",
+        help="SSMLを文・段落単位に分割して並行して合成する",
+    ),
 ) -> None:
     """SSMLファイルを読み込み、Amazon Pollyでオーディオファイルを生成します。"""
     try:
@@ -119,7 +351,7 @@ def main(
             typer.echo(f"出力ファイル名: {output}")
 
         # 音声合成を実行
-        synthesize_ssml(ssml_text, voice.value, output)
+        synthesize_ssml(ssml_text, voice.value, output, parallel=parallel)
 
         typer.echo("✓ 処理が完了しました")
 
@@ -131,5 +363,63 @@ def main(
         raise typer.Exit(code=1)
 
 
+@app.command("batch")
+def batch(
+    input_glob: str = typer.Argument(
+        ...,
+        help="入力SSMLファイルのglobパターン（例: 'data/ssmls/*.ssml'）",
+    ),
+    voice: PollyVoice = typer.Option(
+        PollyVoice.MIZUKI,
+        "--voice",
+        "-v",
+        help="使用する音声モデル名（Amazon Polly VoiceId）",
+        case_sensitive=False,
+    ),
+    concurrency: int = typer.Option(
+        8,
+        "--concurrency",
+        "-c",
+        help="同時に実行する音声合成の数",
+        min=1,
+    ),
+) -> None:
+    """複数のSSMLファイルを並行して読み込み、Amazon Pollyでオーディオファイルを生成します。"""
+    input_files = expand_ssml_glob(input_glob)
+    if not input_files:
+        typer.echo(f"エラー: SSMLファイルが見つかりません: {input_glob}", err=True)
+        raise typer.Exit(code=1)
+
+    # クライアントの生成はスレッドセーフではないため、並行実行の前に生成しておく
+    get_polly_client()
+    _get_s3_client()
+
+    async def synthesize_one(input_file: Path) -> None:
+        ssml_text = read_ssml_file(input_file)
+        output = generate_output_filename(input_file, voice.value)
+        # boto3クライアントはスレッドセーフなため、共有クライアントを別スレッドから並行して呼び出す
+        await asyncio.to_thread(
+            synthesize_ssml, ssml_text, voice.value, output, show_progress=False
+        )
+
+    failures = asyncio.run(run_batch(input_files, synthesize_one, concurrency))
+
+    for input_file, error in failures:
+        typer.echo(f"エラーが発生しました（{input_file}）: {error}", err=True)
+    if failures:
+        raise typer.Exit(code=1)
+
+    typer.echo(f"✓ {len(input_files)}件の処理が完了しました")
+
+
+@app.command("stats")
+def stats() -> None:
+    """音声合成結果のキャッシュの統計情報を表示します。"""
+    result = cache_stats()
+    typer.echo(f"キャッシュディレクトリ: {CACHE_DIR}")
+    typer.echo(f"ファイル数: {result['entries']}")
+    typer.echo(f"合計サイズ: {result['total_size'] / 1024 / 1024:.1f} MiB")
+
+
 if __name__ == "__main__":
     app()
@@ -2,25 +2,48 @@
 
 Usage:
     # 出力ファイル名を自動生成する場合
-    uv run src/azure_tts.py data/ssmls/input.ssml
+    uv run src/azure_tts.py synth data/ssmls/input.ssml
 
     # 出力ファイル名を指定する場合
-    uv run src/azure_tts.py data/ssmls/input.ssml --output data/audios/output.mp3
+    uv run src/azure_tts.py synth data/ssmls/input.ssml --output data/audios/output.mp3
 
     # 音声を指定する場合
-    uv run src/azure_tts.py data/ssmls/input.ssml --voice ja-JP-NanamiNeural
+    uv run src/azure_tts.py synth data/ssmls/input.ssml --voice ja-JP-NanamiNeural
+
+    # Ogg Opus 形式で出力する場合
+    uv run src/azure_tts.py synth data/ssmls/input.ssml --format opus
+
+    # 複数の SSML ファイルをまとめて変換する場合
+    uv run src/azure_tts.py batch "data/ssmls/*.ssml" --concurrency 8
+
+    # 合成結果のキャッシュの統計情報を表示する場合
+    uv run src/azure_tts.py stats
 """
 
+import asyncio
 import os
+import threading
 from enum import Enum
+from functools import cache
 from pathlib import Path
 
 import azure.cognitiveservices.speech as speechsdk
 import typer
 from dotenv import load_dotenv
-from rich.console import Console
 
-from utils import generate_output_filename, read_ssml_file
+from utils import (
+    CACHE_DIR,
+    cache_stats,
+    cached_synthesize,
+    expand_ssml_glob,
+    generate_output_filename,
+    progress_status,
+    read_ssml_file,
+    run_batch,
+    split_ssml,
+    synthesize_parallel,
+    write_audio,
+)
 
 
 class AzureVoice(str, Enum):
@@ -38,6 +61,20 @@ class AzureVoice(str, Enum):
     NANAMI_DRAGON = "ja-JP-Nanami:DragonHDLatestNeural"
 
 
+class AzureAudioFormat(str, Enum):
+    """Azure Speech Serviceの出力形式（値は出力ファイルの拡張子）"""
+
+    MP3 = "mp3"  # 16kHz、32kbps、モノラル
+    OPUS = "opus"  # 48kHz、Ogg Opus、モノラル
+
+
+# 出力形式ごとのAzure Speech SDKの設定値
+_OUTPUT_FORMATS = {
+    AzureAudioFormat.MP3: speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3,
+    AzureAudioFormat.OPUS: speechsdk.SpeechSynthesisOutputFormat.Ogg48Khz16BitMonoOpus,
+}
+
+
 # 環境変数を読み込み
 load_dotenv()
 AZURE_SPEECH_KEY = os.getenv("AZURE_SPEECH_KEY")
@@ -46,54 +83,156 @@ AZURE_SPEECH_REGION = os.getenv("AZURE_SPEECH_REGION")
 app = typer.Typer()
 
 
-def synthesize_ssml(
-    ssml_text: str,
-    voice_name: str,
-    output_path: Path,
-) -> None:
-    """SSMLをオーディオファイルに変換する。
+def _fill_voice_name(ssml_text: str, voice_name: str) -> str:
+    """SSMLテキスト内の `{voice_name}` プレースホルダーをボイス名に置き換える。
+
+    置き換えるのは `{voice_name}` のみで、それ以外の `{` / `}` はそのまま残す。
 
     Args:
         ssml_text: SSML形式のテキスト（{voice_name}プレースホルダーを含む）
         voice_name: 使用する音声モデル名（例: 'ja-JP-NanamiNeural'）
-        output_path: 出力先のオーディオファイルパス
+
+    Returns:
+        ボイス名を設定したSSMLテキスト
+    """
+    return ssml_text.replace("{voice_name}", voice_name)
+
+
+def _require_azure_creds() -> None:
+    """Azure認証情報が設定されていることを確認する。
+
+    `--help` などが認証情報なしでも動くよう、インポート時ではなく最初の音声合成の前に呼び出す。
+
+    Raises:
+        ValueError: AZURE_SPEECH_KEY または AZURE_SPEECH_REGION が設定されていない場合
     """
     if not AZURE_SPEECH_KEY or not AZURE_SPEECH_REGION:
         raise ValueError(
             "Azure認証情報が設定されていません。AZURE_SPEECH_KEYとAZURE_SPEECH_REGIONを.envファイルに設定してください。"
         )
 
-    # SSMLテキスト内のプレースホルダーにボイス名を設定
-    formatted_ssml = ssml_text.format(voice_name=voice_name)
+
+@cache
+def _get_speech_config(audio_format: AzureAudioFormat) -> speechsdk.SpeechConfig:
+    """出力形式ごとのAzure Speech設定を取得する。"""
+    _require_azure_creds()
 
     # Azure Speech設定を初期化
     speech_config = speechsdk.SpeechConfig(
         subscription=AZURE_SPEECH_KEY, region=AZURE_SPEECH_REGION
     )
 
-    # MP3形式で出力するように設定
-    speech_config.set_speech_synthesis_output_format(
-        speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3
-    )
+    # 指定した形式で出力するように設定
+    speech_config.set_speech_synthesis_output_format(_OUTPUT_FORMATS[audio_format])
 
-    # 出力ディレクトリが存在しない場合は作成
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    return speech_config
 
-    # オーディオ設定（ファイルに出力）
-    audio_config = speechsdk.audio.AudioOutputConfig(filename=str(output_path))
 
-    # Speech Synthesizerを作成
-    speech_synthesizer = speechsdk.SpeechSynthesizer(
-        speech_config=speech_config, audio_config=audio_config
+def _create_speech_synthesizer(
+    audio_format: AzureAudioFormat,
+) -> speechsdk.SpeechSynthesizer:
+    """合成結果をメモリ上で受け取るSpeech Synthesizerを作成する。"""
+    # audio_config=None で合成結果をメモリ上で受け取る
+    return speechsdk.SpeechSynthesizer(
+        speech_config=_get_speech_config(audio_format), audio_config=None
     )
 
+
+# スレッドごとのSpeech Synthesizer（出力形式ごと）
+_thread_local = threading.local()
+
+
+def _get_speech_synthesizer(
+    audio_format: AzureAudioFormat,
+) -> speechsdk.SpeechSynthesizer:
+    """出力形式ごとのSpeech Synthesizerを取得する。
+
+    WebSocket接続の確立を呼び出しごとに行わないよう、スレッド内で使い回す。
+    1つのSpeech Synthesizerは合成要求を順番に処理するため、スレッド間では共有せず、
+    設定（SpeechConfig）のみを共有する。
+    """
+    synthesizers = getattr(_thread_local, "synthesizers", None)
+    if synthesizers is None:
+        synthesizers = _thread_local.synthesizers = {}
+    if audio_format not in synthesizers:
+        synthesizers[audio_format] = _create_speech_synthesizer(audio_format)
+    return synthesizers[audio_format]
+
+
+def _synthesize_chunk(ssml_text: str, voice_name: str) -> bytes:
+    """分割したSSMLを合成し、オーディオのバイト列を返す。
+
+    1つのSpeech Synthesizerは合成要求を順番に処理するため、スレッドごとのSynthesizerを
+    使い、各スレッドでは接続を使い回す。
+
+    Args:
+        ssml_text: 分割したSSML形式のテキスト（{voice_name}プレースホルダーを含む）
+        voice_name: 使用する音声モデル名（例: 'ja-JP-NanamiNeural'）
+
+    Returns:
+        MP3形式のオーディオのバイト列
+    """
+    formatted_ssml = _fill_voice_name(ssml_text, voice_name)
+    speech_synthesizer = _get_speech_synthesizer(AzureAudioFormat.MP3)
+    result = speech_synthesizer.speak_ssml_async(formatted_ssml).get()
+    if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+        cancellation_details = result.cancellation_details
+        raise Exception(
+            f"音声合成がキャンセルされました: {cancellation_details.reason} {cancellation_details.error_details}"
+        )
+    return result.audio_data
+
+
+def _synthesize_ssml(
+    ssml_text: str,
+    voice_name: str,
+    output_path: Path,
+    show_progress: bool = True,
+    parallel: bool = False,
+    audio_format: AzureAudioFormat = AzureAudioFormat.MP3,
+) -> None:
+    """APIを呼び出してSSMLをオーディオファイルに変換する。
+
+    Args:
+        ssml_text: SSML形式のテキスト（{voice_name}プレースホルダーを含む）
+        voice_name: 使用する音声モデル名（例: 'ja-JP-NanamiNeural'）
+        output_path: 出力先のオーディオファイルパス
+        show_progress: 合成中にスピナーを表示するかどうか
+        parallel: SSMLを文・段落単位に分割して並行して合成するかどうか（MP3形式のみ）
+        audio_format: 出力形式
+    """
+    # SSMLを文・段落単位に分割できる場合は、並行して合成する
+    if parallel and len(chunks := split_ssml(ssml_text)) > 1:
+        # 各スレッドで設定を重複して生成しないよう、並行実行の前に生成しておく
+        _get_speech_config(audio_format)
+        with progress_status(
+            f"音声合成を実行中（{len(chunks)}分割）...", show_progress
+        ):
+            synthesize_parallel(
+                chunks,
+                lambda chunk: _synthesize_chunk(chunk, voice_name),
+                output_path,
+            )
+        typer.echo(f"✓ オーディオファイルを保存しました: {output_path}")
+        return
+
+    # SSMLテキスト内のプレースホルダーにボイス名を設定
+    formatted_ssml = _fill_voice_name(ssml_text, voice_name)
+
+    # Speech Synthesizerを取得
+    speech_synthesizer = _get_speech_synthesizer(audio_format)
+
     # 音声合成を実行
-    console = Console()
-    with console.status("[bold green]音声合成を実行中...", spinner="dots"):
+    with progress_status("音声合成を実行中...", show_progress):
         result = speech_synthesizer.speak_ssml_async(formatted_ssml).get()
 
     # 結果を確認
     if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+        # 出力ディレクトリが存在しない場合は作成
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # オーディオコンテンツをファイルに書き込む
+        write_audio(output_path, result.audio_data)
         typer.echo(f"✓ オーディオファイルを保存しました: {output_path}")
     elif result.reason == speechsdk.ResultReason.Canceled:
         cancellation_details = result.cancellation_details
@@ -104,7 +243,51 @@ def synthesize_ssml(
                 raise Exception(f"音声合成エラー: {cancellation_details.error_details}")
 
 
-@app.command()
+def synthesize_ssml(
+    ssml_text: str,
+    voice_name: str,
+    output_path: Path,
+    show_progress: bool = True,
+    parallel: bool = False,
+    audio_format: AzureAudioFormat = AzureAudioFormat.MP3,
+) -> None:
+    """SSMLをオーディオファイルに変換する。
+
+    同じSSMLと音声モデルの組み合わせで合成済みの場合は、APIを呼び出さずにキャッシュを利用する。
+    分割して合成した結果は連結部分が異なるため、分割の有無ごとに別々にキャッシュする。
+
+    Args:
+        ssml_text: SSML形式のテキスト（{voice_name}プレースホルダーを含む）
+        voice_name: 使用する音声モデル名（例: 'ja-JP-NanamiNeural'）
+        output_path: 出力先のオーディオファイルパス
+        show_progress: 合成中にスピナーを表示するかどうか
+        parallel: SSMLを文・段落単位に分割して並行して合成するかどうか（MP3形式のみ）
+        audio_format: 出力形式
+
+    Raises:
+        ValueError: MP3形式以外で分割合成を指定した場合
+    """
+    # バイト列をそのまま連結できるのはMP3のみ
+    if parallel and audio_format != AzureAudioFormat.MP3:
+        raise ValueError("--parallel はMP3形式でのみ使用できます")
+
+    if cached_synthesize(
+        (
+            ssml_text,
+            voice_name,
+            "azure",
+            audio_format.value,
+            "parallel" if parallel else "single",
+        ),
+        output_path,
+        lambda: _synthesize_ssml(
+            ssml_text, voice_name, output_path, show_progress, parallel, audio_format
+        ),
+    ):
+        typer.echo(f"✓ キャッシュからオーディオファイルを復元しました: {output_path}")
+
+
+@app.command("synth")
 def main(
     input_file: Path = typer.Argument(
         ...,
@@ -118,7 +301,7 @@ def main(
         None,
         "--output",
         "-o",
-        help="出力オーディオファイルのパス（MP3形式）。指定しない場合は自動生成されます。",
+        help="出力オーディオファイルのパス。指定しない場合は自動生成されます。",
     ),
     voice: AzureVoice = typer.Option(
         AzureVoice.NANAMI,
@@ -127,6 +310,18 @@ def main(
         help="使用する音声モデル名（Azure Neural Voice）",
         case_sensitive=False,
     ),
+    parallel: bool = typer.Option(
+        False,
+        "--parallel/--no-parallel",
+        help="SSMLを文・段落単位に分割して並行して合成する（MP3形式のみ）",
+    ),
+    audio_format: AzureAudioFormat | None = typer.Option(
+        None,
+        "--format",
+        "-f",
+        help="出力形式。指定しない場合は出力ファイルの拡張子から判定します（デフォルト: mp3）。",
+        case_sensitive=False,
+    ),
 ) -> None:
     """SSMLファイルを読み込み、Azure Speech Serviceでオーディオファイルを生成します。"""
     try:
@@ -134,13 +329,26 @@ def main(
         typer.echo(f"SSMLファイルを読み込んでいます: {input_file}")
         ssml_text = read_ssml_file(input_file)
 
+        # 出力形式を決定（指定されていない場合は出力ファイルの拡張子から判定）
+        if audio_format is None:
+            is_opus = output is not None and output.suffix == ".opus"
+            audio_format = AzureAudioFormat.OPUS if is_opus else AzureAudioFormat.MP3
+
         # 出力ファイル名を決定（指定されていない場合は自動生成、utils.pyの関数を使用）
         if output is None:
-            output = generate_output_filename(input_file, voice.value)
+            output = generate_output_filename(
+                input_file, voice.value, f".{audio_format.value}"
+            )
             typer.echo(f"出力ファイル名: {output}")
 
         # 音声合成を実行
-        synthesize_ssml(ssml_text, voice.value, output)
+        synthesize_ssml(
+            ssml_text,
+            voice.value,
+            output,
+            parallel=parallel,
+            audio_format=audio_format,
+        )
 
         typer.echo("✓ 処理が完了しました")
 
@@ -152,5 +360,80 @@ def main(
         raise typer.Exit(code=1)
 
 
+@app.command("batch")
+def batch(
+    input_glob: str = typer.Argument(
+        ...,
+        help="入力SSMLファイルのglobパターン（例: 'data/ssmls/*.ssml'）",
+    ),
+    voice: AzureVoice = typer.Option(
+        AzureVoice.NANAMI,
+        "--voice",
+        "-v",
+        help="使用する音声モデル名（Azure Neural Voice）",
+        case_sensitive=False,
+    ),
+    concurrency: int = typer.Option(
+        8,
+        "--concurrency",
+        "-c",
+        help="同時に実行する音声合成の数",
+        min=1,
+    ),
+    audio_format: AzureAudioFormat = typer.Option(
+        AzureAudioFormat.MP3,
+        "--format",
+        "-f",
+        help="出力形式",
+        case_sensitive=False,
+    ),
+) -> None:
+    """複数のSSMLファイルを並行して読み込み、Azure Speech Serviceでオーディオファイルを生成します。"""
+    input_files = expand_ssml_glob(input_glob)
+    if not input_files:
+        typer.echo(f"エラー: SSMLファイルが見つかりません: {input_glob}", err=True)
+        raise typer.Exit(code=1)
+
+    # 各スレッドで設定を重複して生成しないよう、並行実行の前に生成しておく
+    try:
+        _get_speech_config(audio_format)
+    except ValueError as e:
+        typer.echo(f"エラー: {e}", err=True)
+        raise typer.Exit(code=1)
+
+    async def synthesize_one(input_file: Path) -> None:
+        ssml_text = read_ssml_file(input_file)
+        output = generate_output_filename(
+            input_file, voice.value, f".{audio_format.value}"
+        )
+        # Azure Speech SDKは同期APIのため、別スレッド（スレッドごとのSynthesizer）で実行する
+        await asyncio.to_thread(
+            synthesize_ssml,
+            ssml_text,
+            voice.value,
+            output,
+            show_progress=False,
+            audio_format=audio_format,
+        )
+
+    failures = asyncio.run(run_batch(input_files, synthesize_one, concurrency))
+
+    for input_file, error in failures:
+        typer.echo(f"エラーが発生しました（{input_file}）: {error}", err=True)
+    if failures:
+        raise typer.Exit(code=1)
+
+    typer.echo(f"✓ {len(input_files)}件の処理が完了しました")
+
+
+@app.command("stats")
+def stats() -> None:
+    """音声合成結果のキャッシュの統計情報を表示します。"""
+    result = cache_stats()
+    typer.echo(f"キャッシュディレクトリ: {CACHE_DIR}")
+    typer.echo(f"ファイル数: {result['entries']}")
+    typer.echo(f"合計サイズ: {result['total_size'] / 1024 / 1024:.1f} MiB")
+
+
 if __name__ == "__main__":
     app()
@@ -2,83 +2,220 @@
 
 Usage:
     # 出力ファイル名を自動生成する場合
-    uv run src/google_tts.py data/ssmls/input.ssml
+    uv run src/google_tts.py synth data/ssmls/input.ssml
 
     # 出力ファイル名を指定する場合
-    uv run src/google_tts.py data/ssmls/input.ssml --output data/audios/output.mp3
+    uv run src/google_tts.py synth data/ssmls/input.ssml --output data/audios/output.mp3
 
     # 音声を指定する場合
-    uv run src/google_tts.py data/ssmls/input.ssml --voice ja-JP-Chirp3-HD-Sulafat
+    uv run src/google_tts.py synth data/ssmls/input.ssml --voice ja-JP-Chirp3-HD-Sulafat
+
+    # 複数の SSML ファイルをまとめて変換する場合
+    uv run src/google_tts.py batch "data/ssmls/*.ssml" --concurrency 8
+
+    # 合成結果のキャッシュの統計情報を表示する場合
+    uv run src/google_tts.py stats
 """
 
+import asyncio
+from functools import cache, lru_cache
 from pathlib import Path
 
 import typer
 from dotenv import load_dotenv
 from google.cloud import texttospeech  # type: ignore
-from rich.console import Console
 
-from utils import generate_output_filename, read_ssml_file
+from utils import (
+    CACHE_DIR,
+    cache_stats,
+    cached_synthesize,
+    cached_synthesize_async,
+    expand_ssml_glob,
+    generate_output_filename,
+    progress_status,
+    read_ssml_file,
+    run_batch,
+    split_ssml,
+    synthesize_parallel,
+    write_audio,
+)
 
 # 環境変数を読み込み
 load_dotenv()
 
 app = typer.Typer()
 
+# オーディオ設定（MP3形式で出力）
+_MP3_CONFIG = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
 
-def synthesize_ssml(
+
+@cache
+def _get_google_client() -> texttospeech.TextToSpeechClient:
+    """Text-to-Speechクライアントを取得する。
+
+    認証情報の探索やgRPCチャネルの確立を呼び出しごとに行わないよう、プロセス内で使い回す。
+    """
+    return texttospeech.TextToSpeechClient()
+
+
+@lru_cache(maxsize=16)
+def _voice_params(voice_name: str) -> texttospeech.VoiceSelectionParams:
+    """音声パラメータを構築する。
+
+    Args:
+        voice_name: 使用する音声モデル名（例: 'ja-JP-Chirp3-HD-Zephyr'）
+
+    Returns:
+        音声パラメータ
+    """
+    # 言語コードを音声名から抽出（例: 'ja-JP-Chirp3-HD-Zephyr' -> 'ja-JP'）
+    language_code = "-".join(voice_name.split("-")[:2])
+
+    return texttospeech.VoiceSelectionParams(
+        language_code=language_code,
+        name=voice_name,
+    )
+
+
+def _build_request(
     ssml_text: str,
     voice_name: str,
-    output_path: Path,
-) -> None:
-    """SSMLをオーディオファイルに変換する。
+) -> texttospeech.SynthesizeSpeechRequest:
+    """音声合成リクエストを構築する。
 
     Args:
         ssml_text: SSML形式のテキスト（{voice_name}プレースホルダーを含む）
         voice_name: 使用する音声モデル名（例: 'ja-JP-Chirp3-HD-Zephyr'）
-        output_path: 出力先のオーディオファイルパス
+
+    Returns:
+        音声合成リクエスト
     """
     # SSMLテキスト内のプレースホルダーにボイス名を設定
     formatted_ssml = ssml_text.format(voice_name=voice_name)
 
-    # Text-to-Speechクライアントを初期化
-    client = texttospeech.TextToSpeechClient()
-
     # 音声リクエストを構築
     synthesis_input = texttospeech.SynthesisInput(ssml=formatted_ssml)
 
-    # 言語コードを音声名から抽出（例: 'ja-JP-Chirp3-HD-Zephyr' -> 'ja-JP'）
-    language_code = "-".join(voice_name.split("-")[:2])
-
-    # 音声パラメータを設定
-    voice = texttospeech.VoiceSelectionParams(
-        language_code=language_code,
-        name=voice_name,
+    return texttospeech.SynthesizeSpeechRequest(
+        input=synthesis_input,
+        voice=_voice_params(voice_name),
+        audio_config=_MP3_CONFIG,
     )
 
-    # オーディオ設定（MP3形式で出力）
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3
-    )
-
-    # 音声合成を実行
-    console = Console()
-    with console.status("[bold green]音声合成を実行中...", spinner="dots"):
-        response = client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config,
-        )
 
+def _save_audio(audio_content: bytes, output_path: Path) -> None:
+    """合成したオーディオコンテンツをファイルに書き込む。"""
     # 出力ディレクトリが存在しない場合は作成
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     # オーディオコンテンツをファイルに書き込む
-    output_path.write_bytes(response.audio_content)
+    write_audio(output_path, audio_content)
     typer.echo(f"✓ オーディオファイルを保存しました: {output_path}")
 
 
-@app.command()
+def _synthesize_ssml(
+    ssml_text: str,
+    voice_name: str,
+    output_path: Path,
+    show_progress: bool = True,
+    parallel: bool = False,
+) -> None:
+    """APIを呼び出してSSMLをオーディオファイルに変換する。
+
+    Args:
+        ssml_text: SSML形式のテキスト（{voice_name}プレースホルダーを含む）
+        voice_name: 使用する音声モデル名（例: 'ja-JP-Chirp3-HD-Zephyr'）
+        output_path: 出力先のオーディオファイルパス
+        show_progress: 合成中にスピナーを表示するかどうか
+        parallel: SSMLを文・段落単位に分割して並行して合成するかどうか
+    """
+    # Text-to-Speechクライアントを取得
+    client = _get_google_client()
+
+    # SSMLを文・段落単位に分割できる場合は、並行して合成する
+    if parallel and len(chunks := split_ssml(ssml_text)) > 1:
+        with progress_status(
+            f"音声合成を実行中（{len(chunks)}分割）...", show_progress
+        ):
+            synthesize_parallel(
+                chunks,
+                lambda chunk: (
+                    client.synthesize_speech(
+                        request=_build_request(chunk, voice_name)
+                    ).audio_content
+                ),
+                output_path,
+            )
+        typer.echo(f"✓ オーディオファイルを保存しました: {output_path}")
+        return
+
+    request = _build_request(ssml_text, voice_name)
+
+    # 音声合成を実行
+    with progress_status("音声合成を実行中...", show_progress):
+        response = client.synthesize_speech(request=request)
+
+    _save_audio(response.audio_content, output_path)
+
+
+def synthesize_ssml(
+    ssml_text: str,
+    voice_name: str,
+    output_path: Path,
+    show_progress: bool = True,
+    parallel: bool = False,
+) -> None:
+    """SSMLをオーディオファイルに変換する。
+
+    同じSSMLと音声モデルの組み合わせで合成済みの場合は、APIを呼び出さずにキャッシュを利用する。
+    分割して合成した結果は連結部分が異なるため、分割の有無ごとに別々にキャッシュする。
+
+    Args:
+        ssml_text: SSML形式のテキスト（{voice_name}プレースホルダーを含む）
+        voice_name: 使用する音声モデル名（例: 'ja-JP-Chirp3-HD-Zephyr'）
+        output_path: 出力先のオーディオファイルパス
+        show_progress: 合成中にスピナーを表示するかどうか
+        parallel: SSMLを文・段落単位に分割して並行して合成するかどうか
+    """
+    if cached_synthesize(
+        (ssml_text, voice_name, "google", "parallel" if parallel else "single"),
+        output_path,
+        lambda: _synthesize_ssml(
+            ssml_text, voice_name, output_path, show_progress, parallel
+        ),
+    ):
+        typer.echo(f"✓ キャッシュからオーディオファイルを復元しました: {output_path}")
+
+
+async def synthesize_ssml_async(
+    client: texttospeech.TextToSpeechAsyncClient,
+    ssml_text: str,
+    voice_name: str,
+    output_path: Path,
+) -> None:
+    """非同期クライアントを使ってSSMLをオーディオファイルに変換する。
+
+    Args:
+        client: 共有する非同期Text-to-Speechクライアント
+        ssml_text: SSML形式のテキスト（{voice_name}プレースホルダーを含む）
+        voice_name: 使用する音声モデル名（例: 'ja-JP-Chirp3-HD-Zephyr'）
+        output_path: 出力先のオーディオファイルパス
+    """
+
+    async def synthesize() -> None:
+        response = await client.synthesize_speech(
+            request=_build_request(ssml_text, voice_name)
+        )
+        # ファイルの書き込みはイベントループを止めないよう別スレッドで実行する
+        await asyncio.to_thread(_save_audio, response.audio_content, output_path)
+
+    if await cached_synthesize_async(
+        (ssml_text, voice_name, "google", "single"), output_path, synthesize
+    ):
+        typer.echo(f"✓ キャッシュからオーディオファイルを復元しました: {output_path}")
+
+
+@app.command("synth")
 def main(
     input_file: Path = typer.Argument(
         ...,
@@ -100,6 +237,11 @@ def main(
         "-v",
         help="使用する音声モデル名",
     ),
+    parallel: bool = typer.Option(
+        False,
+        "--parallel/--no-parallel",
+        help="SSMLを文・段落単位に分割して並行して合成する",
+    ),
 ) -> None:
     """SSMLファイルを読み込み、Google Cloud Text-to-Speechでオーディオファイルを生成します。"""
     try:
@@ -113,7 +255,7 @@ def main(
             typer.echo(f"出力ファイル名: {output}")
 
         # 音声合成を実行
-        synthesize_ssml(ssml_text, voice, output)
+        synthesize_ssml(ssml_text, voice, output, parallel=parallel)
 
         typer.echo("✓ 処理が完了しました")
 
@@ -125,5 +267,61 @@ def main(
         raise typer.Exit(code=1)
 
 
+@app.command("batch")
+def batch(
+    input_glob: str = typer.Argument(
+        ...,
+        help="入力SSMLファイルのglobパターン（例: 'data/ssmls/*.ssml'）",
+    ),
+    voice: str = typer.Option(
+        "ja-JP-Chirp3-HD-Zephyr",
+        "--voice",
+        "-v",
+        help="使用する音声モデル名",
+    ),
+    concurrency: int = typer.Option(
+        8,
+        "--concurrency",
+        "-c",
+        help="同時に実行する音声合成の数",
+        min=1,
+    ),
+) -> None:
+    """複数のSSMLファイルを並行して読み込み、Google Cloud Text-to-Speechでオーディオファイルを生成します。"""
+    input_files = expand_ssml_glob(input_glob)
+    if not input_files:
+        typer.echo(f"エラー: SSMLファイルが見つかりません: {input_glob}", err=True)
+        raise typer.Exit(code=1)
+
+    async def run() -> list[tuple[Path, BaseException]]:
+        # 1つのクライアント（HTTP/2コネクション）を全タスクで共有し、終了時にチャネルを閉じる
+        async with texttospeech.TextToSpeechAsyncClient() as client:
+
+            async def synthesize_one(input_file: Path) -> None:
+                ssml_text = read_ssml_file(input_file)
+                output = generate_output_filename(input_file, voice)
+                await synthesize_ssml_async(client, ssml_text, voice, output)
+
+            return await run_batch(input_files, synthesize_one, concurrency)
+
+    failures = asyncio.run(run())
+
+    for input_file, error in failures:
+        typer.echo(f"エラーが発生しました（{input_file}）: {error}", err=True)
+    if failures:
+        raise typer.Exit(code=1)
+
+    typer.echo(f"✓ {len(input_files)}件の処理が完了しました")
+
+
+@app.command("stats")
+def stats() -> None:
+    """音声合成結果のキャッシュの統計情報を表示します。"""
+    result = cache_stats()
+    typer.echo(f"キャッシュディレクトリ: {CACHE_DIR}")
+    typer.echo(f"ファイル数: {result['entries']}")
+    typer.echo(f"合計サイズ: {result['total_size'] / 1024 / 1024:.1f} MiB")
+
+
 if __name__ == "__main__":
     app()
@@ -1,12 +1,44 @@
+import asyncio
+import copy
+import glob
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, closing, nullcontext
+from functools import cache
 from pathlib import Path
 
+from rich.console import Console
 
-def generate_output_filename(input_file: Path, model_name: str) -> Path:
-    """入力ファイル名とモデル名からMP3出力ファイル名を生成する。
+# 合成結果のキャッシュを保存するディレクトリ
+CACHE_DIR = Path.home() / ".cache" / "try-tts"
+
+# キャッシュファイルの索引（SQLite）
+CACHE_INDEX_PATH = CACHE_DIR / "index.sqlite"
+
+# XMLの空白文字の連続
+_XML_WHITESPACE = re.compile(r"[ \t\r\n]+")
+
+# 並行合成のために分割する単位となるSSML要素（文・段落）
+_SEGMENT_TAGS = ("s", "p")
+
+
+def generate_output_filename(
+    input_file: Path, model_name: str, suffix: str = ".mp3"
+) -> Path:
+    """入力ファイル名とモデル名からオーディオ出力ファイル名を生成する。
 
     Args:
         input_file: 入力SSMLファイルのパス
         model_name: 使用する音声モデル名
+        suffix: 出力ファイルの拡張子（例: '.mp3', '.opus'）
 
     Returns:
         生成された出力ファイルのパス（data/audios/ディレクトリ）
@@ -22,7 +54,7 @@ def generate_output_filename(input_file: Path, model_name: str) -> Path:
     safe_model_name = model_name.replace("/", "-").replace("\\", "-")
 
     # 出力ファイル名を生成（ボイスネームの後にSSMLファイル名）
-    output_filename = f"{safe_model_name}_{base_name}.mp3"
+    output_filename = f"{safe_model_name}_{base_name}{suffix}"
 
     # data/audios/ディレクトリに配置
     output_dir = Path("data/audios")
@@ -41,7 +73,412 @@ def read_ssml_file(file_path: Path) -> str:
     Raises:
         FileNotFoundError: ファイルが存在しない場合
     """
-    if not file_path.exists():
+    try:
+        return file_path.read_text(encoding="utf-8")
+    except FileNotFoundError:
         raise FileNotFoundError(f"SSMLファイルが見つかりません: {file_path}")
 
-    return file_path.read_text(encoding="utf-8")
+
+def write_audio(output_path: Path, data: bytes) -> None:
+    """オーディオのバイト列をファイルに書き込む。
+
+    `os.posix_fallocate` が使える環境では、書き込む前にファイルサイズ分の領域を確保して
+    断片化を防ぐ。
+
+    Args:
+        output_path: 出力先のオーディオファイルパス
+        data: オーディオのバイト列
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(output_path, flags, 0o644)
+    try:
+        if data and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, len(data))
+            except OSError:
+                # 領域の事前確保に対応していないファイルシステムではそのまま書き込む
+                pass
+
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+@cache
+def _get_console() -> Console:
+    """スピナー表示に使うConsoleを取得する。"""
+    return Console()
+
+
+def progress_status(message: str, enabled: bool = True) -> AbstractContextManager:
+    """処理中のスピナーを表示するコンテキストマネージャを返す。
+
+    標準出力が端末でない場合や `enabled` が False の場合は何も表示しない。
+
+    Args:
+        message: スピナーの横に表示するメッセージ
+        enabled: スピナーを表示するかどうか
+
+    Returns:
+        スピナーを表示するコンテキストマネージャ
+    """
+    if not enabled or not sys.stdout.isatty():
+        return nullcontext()
+    return _get_console().status(f"[bold green]{message}", spinner="dots")
+
+
+def _canonical_ssml(ssml: str) -> str:
+    """キャッシュキー用にSSMLを正規化（C14N）する。
+
+    属性の順序や引用符、タグ内の空白などの表記揺れを吸収する。テキスト中の連続する
+    空白（インデントや改行を含む）は、読み上げ時と同様に1つの空白にまとめる。
+    単語の区切りは変わらないよう、空白を取り除くことはしない。
+    XMLとして解析できない場合はそのまま返す。
+    """
+    try:
+        root = ET.fromstring(ssml)
+    except ET.ParseError:
+        return ssml
+
+    for element in root.iter():
+        if element.text:
+            element.text = _XML_WHITESPACE.sub(" ", element.text)
+        if element.tail:
+            element.tail = _XML_WHITESPACE.sub(" ", element.tail)
+    return ET.canonicalize(ET.tostring(root, encoding="unicode"))
+
+
+def _cache_key(key_material: tuple[str, ...]) -> str:
+    """キャッシュキー（SHA-256ハッシュ）を生成する。
+
+    SSMLは表記揺れでキャッシュを取りこぼさないよう、正規化してからハッシュ化する。
+
+    Args:
+        key_material: キーの元になる文字列（SSMLテキスト、音声モデル名、プロバイダ名など）
+
+    Returns:
+        16進数表記のハッシュ値
+    """
+    ssml_text, *rest = key_material
+    material = "\0".join((_canonical_ssml(ssml_text), *rest))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key_material: tuple[str, ...], output_path: Path) -> Path:
+    """キャッシュファイルのパスを返す（拡張子は出力ファイルに合わせる）。"""
+    return CACHE_DIR / f"{_cache_key(key_material)}{output_path.suffix}"
+
+
+# スレッドごとのキャッシュの索引への接続
+_index_local = threading.local()
+
+
+@cache
+def _init_index() -> None:
+    """キャッシュの索引を作成する（プロセス内で一度だけ実行する）。"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with closing(sqlite3.connect(CACHE_INDEX_PATH, timeout=30)) as connection:
+        # WALモードはデータベースファイルに保存されるため、一度設定すればよい
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache"
+            " (key TEXT PRIMARY KEY, path TEXT NOT NULL, size INTEGER, mtime REAL)"
+        )
+        connection.commit()
+
+
+def _get_index() -> sqlite3.Connection:
+    """キャッシュの索引への接続を取得する。
+
+    sqlite3の接続はスレッド間で共有できないため、スレッドごとに接続して使い回す。
+    """
+    connection = getattr(_index_local, "connection", None)
+    if connection is None:
+        _init_index()
+        connection = sqlite3.connect(CACHE_INDEX_PATH, timeout=30)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        _index_local.connection = connection
+    return connection
+
+
+def _restore_from_cache(cache_path: Path, output_path: Path) -> bool:
+    """キャッシュ済みのファイルを出力先にハードリンクする。
+
+    キャッシュの有無は索引で判定する。キャッシュと出力先が別のファイルシステムにあり
+    ハードリンクできない場合はコピーする。
+
+    Returns:
+        キャッシュにヒットした場合は True
+    """
+    connection = _get_index()
+    row = connection.execute(
+        "SELECT 1 FROM cache WHERE key = ?", (cache_path.name,)
+    ).fetchone()
+    if row is None:
+        return False
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.unlink(missing_ok=True)
+    # 索引に保存したパスではなく、現在のキャッシュディレクトリ内のパスを参照する
+    try:
+        os.link(cache_path, output_path)
+    except FileNotFoundError:
+        # キャッシュファイルが削除されている場合は索引からも削除する
+        with connection:
+            connection.execute("DELETE FROM cache WHERE key = ?", (cache_path.name,))
+        return False
+    except OSError:
+        shutil.copyfile(cache_path, output_path)
+    return True
+
+
+def _store_in_cache(output_path: Path, cache_path: Path) -> None:
+    """合成結果をキャッシュに保存し、索引に登録する。
+
+    出力先をキャッシュにハードリンクする。キャッシュと出力先が別のファイルシステムにあり
+    ハードリンクできない場合はコピーする。
+    """
+    if not output_path.exists():
+        return
+
+    # 書き込み途中のファイルが見えないよう、一時ファイル経由で置き換える
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(
+        f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    tmp_path.unlink(missing_ok=True)
+    try:
+        # 出力ファイルをハードリンクしてキャッシュとし、バイト列のコピーを避ける
+        os.link(output_path, tmp_path)
+    except OSError:
+        shutil.copyfile(output_path, tmp_path)
+    os.replace(tmp_path, cache_path)
+
+    stat = cache_path.stat()
+    connection = _get_index()
+    with connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, path, size, mtime) VALUES (?, ?, ?, ?)",
+            (cache_path.name, str(cache_path), stat.st_size, stat.st_mtime),
+        )
+
+
+def cache_stats() -> dict[str, int]:
+    """キャッシュの統計情報を返す。
+
+    Returns:
+        キャッシュ済みのファイル数（entries）と合計サイズ（total_size、バイト）
+    """
+    entries, total_size = (
+        _get_index()
+        .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache")
+        .fetchone()
+    )
+    return {"entries": entries, "total_size": total_size}
+
+
+def cached_synthesize(
+    key_material: tuple[str, ...],
+    output_path: Path,
+    synth_fn: Callable[[], None],
+) -> bool:
+    """キャッシュを利用して音声合成を行う。
+
+    キャッシュにヒットした場合はキャッシュ済みのファイルを出力先に配置し、
+    ヒットしなかった場合は `synth_fn` を呼び出して合成した結果をキャッシュに保存する。
+
+    Args:
+        key_material: キャッシュキーの元になる文字列（先頭はSSMLテキスト。例: (SSMLテキスト, 音声モデル名, プロバイダ名)）
+        output_path: 出力先のオーディオファイルパス
+        synth_fn: `output_path` にオーディオファイルを書き出す関数
+
+    Returns:
+        キャッシュにヒットした場合は True
+    """
+    cache_path = _cache_path(key_material, output_path)
+    if _restore_from_cache(cache_path, output_path):
+        return True
+
+    # 出力先がキャッシュへのハードリンクの場合、上書きでキャッシュを壊さないよう先に削除する
+    output_path.unlink(missing_ok=True)
+    synth_fn()
+    _store_in_cache(output_path, cache_path)
+    return False
+
+
+async def cached_synthesize_async(
+    key_material: tuple[str, ...],
+    output_path: Path,
+    synth_fn: Callable[[], Awaitable[None]],
+) -> bool:
+    """`cached_synthesize` の非同期版。
+
+    Args:
+        key_material: キャッシュキーの元になる文字列（先頭はSSMLテキスト。例: (SSMLテキスト, 音声モデル名, プロバイダ名)）
+        output_path: 出力先のオーディオファイルパス
+        synth_fn: `output_path` にオーディオファイルを書き出すコルーチン関数
+
+    Returns:
+        キャッシュにヒットした場合は True
+    """
+    cache_path = _cache_path(key_material, output_path)
+    # キャッシュのファイル操作や索引の読み書きはイベントループを止めないよう別スレッドで実行する
+    if await asyncio.to_thread(_restore_from_cache, cache_path, output_path):
+        return True
+
+    # 出力先がキャッシュへのハードリンクの場合、上書きでキャッシュを壊さないよう先に削除する
+    await asyncio.to_thread(output_path.unlink, missing_ok=True)
+    await synth_fn()
+    await asyncio.to_thread(_store_in_cache, output_path, cache_path)
+    return False
+
+
+def expand_ssml_glob(pattern: str) -> list[Path]:
+    """globパターンに一致するSSMLファイルの一覧を返す。
+
+    Args:
+        pattern: globパターン（例: 'data/ssmls/*.ssml'）
+
+    Returns:
+        パターンに一致するファイルのパス（名前順）
+    """
+    return [Path(path) for path in sorted(glob.glob(pattern)) if Path(path).is_file()]
+
+
+async def run_batch(
+    input_files: list[Path],
+    synthesize_one: Callable[[Path], Awaitable[None]],
+    concurrency: int,
+) -> list[tuple[Path, BaseException]]:
+    """複数のファイルに対して、同時実行数を制限しながら音声合成を行う。
+
+    Args:
+        input_files: 入力SSMLファイルのパス
+        synthesize_one: 1ファイル分の音声合成を行うコルーチン関数
+        concurrency: 同時に実行する音声合成の数
+
+    Returns:
+        失敗したファイルと例外の組のリスト
+    """
+    # asyncio.to_thread で実行する同期APIの呼び出しも同時実行数まで並行させるため、
+    # 既定のスレッドプール（最大 CPU数+4）を同時実行数に合わせて置き換える
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=concurrency)
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(input_file: Path) -> None:
+        async with semaphore:
+            await synthesize_one(input_file)
+
+    results = await asyncio.gather(
+        *(run(input_file) for input_file in input_files), return_exceptions=True
+    )
+    return [
+        (input_file, result)
+        for input_file, result in zip(input_files, results)
+        if isinstance(result, BaseException)
+    ]
+
+
+def _local_name(tag: str) -> str:
+    """名前空間を除いたタグ名を返す（例: '{http://...}speak' -> 'speak'）。"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _find_segments(
+    element: ET.Element,
+    ancestors: list[ET.Element],
+) -> list[tuple[list[ET.Element], ET.Element]] | None:
+    """要素の配下から `<s>` / `<p>` 要素を、それを囲む祖先要素とともに列挙する。
+
+    `<s>` / `<p>` の外側にテキストや他の要素がある場合は、分割すると内容が
+    失われるため None を返す。
+    """
+    if (element.text or "").strip():
+        return None
+
+    segments = []
+    for child in element:
+        if (child.tail or "").strip():
+            return None
+        if _local_name(child.tag) in _SEGMENT_TAGS:
+            segments.append((ancestors, child))
+            continue
+        child_segments = _find_segments(child, [*ancestors, child])
+        if not child_segments:
+            return None
+        segments.extend(child_segments)
+    return segments
+
+
+def split_ssml(ssml: str) -> list[str]:
+    """SSMLを文（`<s>`）・段落（`<p>`）単位に分割する。
+
+    分割した各要素は、元の `<speak>` とその間にある `<voice>` や `<prosody>` などの
+    要素（属性を含む）で包み直す。分割できない場合は元のSSMLのみを返す。
+
+    Args:
+        ssml: SSML形式のテキスト
+
+    Returns:
+        分割したSSMLのリスト
+    """
+    try:
+        root = ET.fromstring(ssml)
+    except ET.ParseError:
+        return [ssml]
+
+    segments = _find_segments(root, [])
+    if not segments or len(segments) < 2:
+        return [ssml]
+
+    # ルート要素の名前空間は ns0: などの接頭辞を付けず、デフォルト名前空間として出力する
+    prefix = root.tag[: -len(_local_name(root.tag))]
+    root_attrib = dict(root.attrib)
+    if prefix:
+        root_attrib["xmlns"] = prefix[1:-1]
+
+    def unqualified(tag: str) -> str:
+        return tag[len(prefix) :] if prefix and tag.startswith(prefix) else tag
+
+    chunks = []
+    for ancestors, segment in segments:
+        envelope = ET.Element(unqualified(root.tag), root_attrib)
+        parent = envelope
+        for ancestor in ancestors:
+            parent = ET.SubElement(parent, unqualified(ancestor.tag), ancestor.attrib)
+        segment = copy.deepcopy(segment)
+        segment.tail = None
+        for element in segment.iter():
+            element.tag = unqualified(element.tag)
+        parent.append(segment)
+        chunks.append(ET.tostring(envelope, encoding="unicode"))
+    return chunks
+
+
+def synthesize_parallel(
+    chunks: list[str],
+    synth_fn: Callable[[str], bytes],
+    output_path: Path,
+    concurrency: int = 8,
+) -> None:
+    """分割したSSMLを並行して合成し、1つのオーディオファイルに連結して書き出す。
+
+    MP3はフレーム単位で構成されるため、再エンコードせずにバイト列を連結できる。
+
+    Args:
+        chunks: 分割したSSMLのリスト
+        synth_fn: SSMLを受け取り、合成したオーディオのバイト列を返す関数
+        output_path: 出力先のオーディオファイルパス
+        concurrency: 同時に実行する音声合成の数
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        parts = list(executor.map(synth_fn, chunks))
+
+    # 出力ディレクトリが存在しない場合は作成
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    write_audio(output_path, b"".join(parts))